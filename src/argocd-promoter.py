@@ -6,60 +6,354 @@ This script monitors ArgoCD ApplicationSet files for version updates
 based on comments marked with '# promote this'.
 """
 
+import contextlib
+import io
+import json
+import mmap
+import os
 import re
+import shutil
 import sys
+import tempfile
+import threading
+import time
 import xml.etree.ElementTree as ET
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import cache, lru_cache
 from pathlib import Path
+from typing import IO
 
 import requests
 import typer
 import yaml
 from packaging import version
+from requests.adapters import HTTPAdapter
 from rich.console import Console
 from rich.table import Table
+from urllib3.util.retry import Retry
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YamlLoader
 
 app = typer.Typer(help="ArgoCD ApplicationSet version Promoter")
 console = Console()
 
+# Default maximum number of repository requests in flight at once
+DEFAULT_FETCH_WORKERS = 16
+
+# Maximum number of source files scanned concurrently
+MAX_SCAN_WORKERS = 8
+
+# Source files at least this large are memory-mapped rather than read in one go
+MMAP_MIN_SIZE = 64 * 1024
+
+# Per-thread state; holds each worker thread's HTTP session
+_thread_local = threading.local()
+
+# Tags requested per page from OCI registries, and the most pages followed per repository
+OCI_PAGE_SIZE = 1000
+OCI_MAX_PAGES = 20
+# Next-page URL in an OCI registry's Link header, e.g. </v2/repo/tags/list?last=tag&n=100>; rel="next"
+LINK_NEXT_RE = re.compile(r'<([^>]+)>;\s*rel="next"')
+# Parameters of a registry's WWW-Authenticate challenge, e.g. Bearer realm="...",service="...",scope="..."
+AUTH_PARAM_RE = re.compile(r'(\w+)="([^"]*)"')
+
+# Marker comment identifying the lines to promote, and the field/version pattern of those lines
+PROMOTER_MARKER = "# promote this"
+PROMOTER_LINE_RE = re.compile(r"\s*(\w+):\s*([^\s#]+)")
+# Byte-level marker, for finding marked lines in raw file contents without decoding them
+PROMOTER_MARKER_BYTES = PROMOTER_MARKER.encode()
+
+# Version found in a feed entry title, with an optional pre-release suffix
+RSS_VERSION_RE = re.compile(r"(\d+\.\d+\.\d+(?:-[a-zA-Z0-9.]+)?)")
+STABLE_VERSION_RE = re.compile(r"^\d+\.\d+\.\d+$")
+# Release tag with an optional 'v' prefix (e.g. 1.2.3, v1.2.3); group 1 is the bare version
+SEMVER_TAG_RE = re.compile(r"^v?(\d+\.\d+\.\d+)$")
+# Characters a tag matching SEMVER_TAG_RE can start with
+SEMVER_TAG_FIRST_CHARS = frozenset("v0123456789")
+
+# Markdown summary of the updates, read by the promoter GitHub Actions workflow
+SUMMARY_FILE = "update-summary.md"
+# Status symbols left out of the markdown summary
+SUMMARY_STATUS_STRIP = str.maketrans("", "", "→✓")
+
+# XML namespace of Atom feeds (used by GitHub releases)
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+
+# Seconds during which cached versions are used without contacting the repository
+VERSION_CACHE_TTL = 15 * 60
+
+# Version cache entries are keyed "<repo type>:<repo url>[#<chart>]" and hold:
+#   versions, fetched_at: the versions found in the repository, and when (epoch seconds)
+#   etag, last_modified, digest: validators of the last response for conditional requests
+#     (ETag/Last-Modified for feeds, ETag/Docker-Content-Digest for single-page OCI tag
+#     lists), None when the repository sent none
+
+
+def get_session() -> requests.Session:
+    """
+    Return the HTTP session of the calling thread, creating it on first use.
+
+    requests.Session is not guaranteed to be thread-safe, so every worker thread
+    keeps its own session, and with it its own pool of keep-alive connections.
+    """
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        # Retry transient failures and rate limiting with a short exponential backoff
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=32, max_retries=retries)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _thread_local.session = session
+    return session
+
 
 def load_config(config_path: Path) -> dict:
     """Load the promoter configuration file."""
+    if not yaml.__with_libyaml__:
+        console.print("[yellow]Warning: PyYAML is not using libyaml, YAML parsing will be slow[/yellow]")
+
     try:
         with open(config_path) as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=YamlLoader)
     except Exception as e:
         console.print(f"[red]Error loading config file: {e}[/red]")
         raise typer.Exit(1)  # noqa: B904
 
 
-def fetch_rss_versions(rss_url: str) -> list[str]:
-    """Fetch available versions from an RSS feed."""
+@dataclass(slots=True, frozen=True)
+class Dependency:
+    """A dependency from the promoter configuration, with its fields pre-extracted."""
+
+    name: str
+    # Source file as configured, for display, and resolved, so that aliases of the
+    # same file (symlinks, "..") are read, edited and written as one
+    file: Path
+    path: Path
+    repo_type: str | None
+    repo_url: str | None
+    chart: str | None
+
+    @property
+    def repository(self) -> tuple[str | None, str | None, str | None]:
+        """Identity of the repository the dependency's versions are looked up in."""
+        return (self.repo_type, self.repo_url, self.chart)
+
+
+def normalize_dependencies(config: dict) -> list[Dependency]:
+    """
+    Extract the dependencies of the promoter configuration.
+
+    Dependencies without a source file, or whose source file does not exist,
+    are skipped with a warning.
+    """
+    dependencies = []
+    for dep in config["dependencies"]:
+        dep_name = dep.get("name", "Unknown")
+        source_file = dep.get("source", {}).get("file")
+        repo_info = dep.get("repository", {})
+
+        if not source_file:
+            console.print(f"[yellow]Warning: No source file for {dep_name}[/yellow]")
+            continue
+
+        file_path = Path(source_file)
+        if not file_path.exists():
+            console.print(f"[yellow]Warning: File not found: {file_path}[/yellow]")
+            continue
+
+        dependencies.append(
+            Dependency(
+                name=dep_name,
+                file=file_path,
+                path=file_path.resolve(),
+                repo_type=repo_info.get("type"),
+                repo_url=repo_info.get("url"),
+                chart=repo_info.get("chart"),
+            )
+        )
+
+    return dependencies
+
+
+def _iter_feed_titles(source: IO[bytes]) -> Iterator[str]:
+    """
+    Yield the entry titles of an RSS (<item>) or Atom (<entry>) feed.
+
+    The document is stream-parsed and each entry is detached from the tree once its
+    title has been read, so memory use does not grow with the size of the feed.
+    """
+    # Elements still open at the current parse position; the last one is the parent
+    # of the element being ended
+    open_elems = []
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            open_elems.append(elem)
+            continue
+        open_elems.pop()
+
+        if elem.tag == "item":
+            title = elem.findtext("title")
+        elif elem.tag == f"{ATOM_NS}entry":
+            title = elem.findtext(f"{ATOM_NS}title")
+        else:
+            continue
+        if title:
+            yield title
+        if open_elems:
+            open_elems[-1].remove(elem)
+
+
+def version_cache_file() -> Path:
+    """
+    Return the path of the on-disk cache of the versions found in each repository.
+
+    It lives under $XDG_CACHE_HOME (default ~/.cache). The path is resolved on use
+    rather than at import, so commands that don't touch the cache work without a home
+    directory. Raises RuntimeError if neither is known.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "argocd-promoter" / "versions.json"
+
+
+def _is_valid_cache_entry(entry: object) -> bool:
+    """Check that a version cache entry has the shape written by fetch_dependency_versions."""
+    if not isinstance(entry, dict):
+        return False
+    versions = entry.get("versions", [])
+    if not isinstance(versions, list) or not all(isinstance(v, str) for v in versions):
+        return False
+    fetched_at = entry.get("fetched_at", 0)
+    if not isinstance(fetched_at, int | float) or isinstance(fetched_at, bool):
+        return False
+    return all(
+        entry.get(field) is None or isinstance(entry[field], str) for field in ("etag", "last_modified", "digest")
+    )
+
+
+def load_version_cache() -> dict[str, dict]:
+    """
+    Load the on-disk version cache, returning an empty cache if it is missing or unreadable.
+
+    Entries of an unexpected shape (e.g. written by another version of this tool) are dropped.
+    """
     try:
-        response = requests.get(rss_url, timeout=10)
-        response.raise_for_status()
+        with open(version_cache_file()) as f:
+            cache = json.load(f)
+        if not isinstance(cache, dict):
+            return {}
+        return {key: entry for key, entry in cache.items() if _is_valid_cache_entry(entry)}
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        console.print(f"[yellow]Warning: Ignoring unreadable version cache: {e}[/yellow]")
+        return {}
 
-        root = ET.fromstring(response.content)
-        versions = []
 
-        # Parse RSS feed for version numbers
-        for item in root.findall(".//item"):
-            title = item.find("title")
-            if title is not None and title.text:
+def save_version_cache(cache: dict[str, dict]) -> None:
+    """
+    Persist the version cache to disk.
+
+    The cache is written to a temporary file in the cache directory, which is then
+    renamed over the original, so an overlapping run never reads a half-written cache.
+    """
+    try:
+        cache_file = version_cache_file()
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=cache_file.parent, prefix=f".{cache_file.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(cache, f)
+            os.replace(tmp_name, cache_file)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+    except Exception as e:
+        console.print(f"[yellow]Warning: Could not write version cache: {e}[/yellow]")
+
+
+def fetch_rss_versions(rss_url: str, cached: dict | None = None) -> list[str]:
+    """
+    Fetch available versions from an RSS feed.
+
+    If the feed's version cache entry `cached` is given, the request is made
+    conditional on its ETag/Last-Modified validators, and the cached versions are
+    returned when the server answers 304 Not Modified. The entry is updated with the
+    fresh response.
+    """
+    try:
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        # Stream the body straight into the parser instead of buffering it first
+        with get_session().get(rss_url, headers=headers, stream=True, timeout=10) as response:
+            if response.status_code == 304 and cached and "versions" in cached:
+                return list(cached["versions"])
+            response.raise_for_status()
+            response.raw.decode_content = True
+
+            versions = []
+            for title in _iter_feed_titles(response.raw):
                 # Extract version from title (assuming format like "chaos-mesh 2.7.0")
                 # Capture optional pre-release suffix to filter out non-stable versions
-                match = re.search(r"(\d+\.\d+\.\d+(?:-[a-zA-Z0-9.]+)?)", title.text)
+                match = RSS_VERSION_RE.search(title)
                 if match:
                     full_ver = match.group(1)
                     # Only include stable versions (exclude pre-release like -alpha, -beta, -rc)
-                    if re.match(r"^\d+\.\d+\.\d+$", full_ver):
+                    if STABLE_VERSION_RE.match(full_ver):
                         versions.append(full_ver)
 
+        if cached is not None:
+            cached.update(
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                versions=versions,
+            )
+
         return versions
     except Exception as e:
         console.print(f"[yellow]Warning: Could not fetch RSS feed: {e}[/yellow]")
         return []
 
 
+# One lock per Helm index URL, so concurrent lookups of charts from the same
+# repository wait for a single download instead of racing to fetch it
+_helm_index_locks: dict[str, threading.Lock] = {}
+
+
+def _fetch_helm_index_entries(index_url: str) -> dict:
+    """
+    Fetch the chart entries of a Helm repository index.
+
+    Memoized for the lifetime of the process, so charts tracked from the same
+    repository share one download and parse of its (often large) index.yaml.
+    """
+    with _helm_index_locks.setdefault(index_url, threading.Lock()):
+        return _load_helm_index_entries(index_url)
+
+
+@cache
+def _load_helm_index_entries(index_url: str) -> dict:
+    """Download and parse a Helm repository index; see _fetch_helm_index_entries."""
+    resp = get_session().get(index_url, timeout=10)
+    resp.raise_for_status()
+
+    # Hand the raw bytes to the (libyaml) loader; resp.text would first run charset
+    # detection over the whole index when the server sends no charset
+    data = yaml.load(resp.content, Loader=YamlLoader)
+    return data.get("entries", {}) if isinstance(data, dict) else {}
+
+
 def fetch_helm_repo_versions(repo_url: str, chart_name: str | None = None) -> list[str]:
     """
     Fetch available chart versions from a Helm chart repository (index.yaml).
@@ -76,11 +370,7 @@ def fetch_helm_repo_versions(repo_url: str, chart_name: str | None = None) -> li
         # Normalize to index.yaml
         index_url = repo_url if repo_url.endswith("index.yaml") else repo_url.rstrip("/") + "/index.yaml"
 
-        resp = requests.get(index_url, timeout=10)
-        resp.raise_for_status()
-
-        data = yaml.safe_load(resp.text)
-        entries = data.get("entries", {}) if isinstance(data, dict) else {}
+        entries = _fetch_helm_index_entries(index_url)
 
         versions = []
         if chart_name:
@@ -98,19 +388,27 @@ def fetch_helm_repo_versions(repo_url: str, chart_name: str | None = None) -> li
                         versions.append(str(v))
 
         # Deduplicate and return
-        return sorted(set(versions), key=lambda s: version.parse(s))
+        return sorted(set(versions), key=_parse)
     except Exception as e:
         console.print(f"[yellow]Warning: Could not fetch Helm index: {e}[/yellow]")
         return []
 
 
-def fetch_oci_versions(oci_url: str) -> list[str]:
+def fetch_oci_versions(oci_url: str, cached: dict | None = None) -> list[str]:
     """
     Fetch available versions from an OCI registry.
 
     Supports OCI URLs in the format: oci://registry/repository/image
-    Currently supports ghcr.io and docker.io with anonymous access.
+    Supports anonymous access: requests are first made without credentials, and an
+    anonymous token is only fetched when the registry answers with a Bearer challenge.
     Handles pagination to retrieve all tags.
+
+    If the repository's version cache entry `cached` is given and the registry sent an
+    ETag for a tag list that fit in a single page, the request is made conditional on
+    it, and the cached versions are returned when the registry answers 304 Not
+    Modified. Registries that send a Docker-Content-Digest instead of an ETag are
+    checked with a HEAD request, and the listing is skipped when the digest is
+    unchanged.
     """
     try:
         # Parse OCI URL: oci://ghcr.io/ariga/charts/atlas-operator
@@ -125,9 +423,6 @@ def fetch_oci_versions(oci_url: str) -> list[str]:
         registry = parts[0]
         repository = parts[1]
 
-        # Get anonymous token for the registry
-        token = _get_oci_token(registry, repository)
-
         # Determine the actual API endpoint (Docker Hub uses registry-1.docker.io)
         api_registry = registry
         if registry == "docker.io":
@@ -135,14 +430,43 @@ def fetch_oci_versions(oci_url: str) -> list[str]:
 
         # Fetch all tags from the registry (with pagination)
         all_tags = []
-        tags_url: str | None = f"https://{api_registry}/v2/{repository}/tags/list"
+        # Ask for large pages up front; registries cap `n` at their own maximum
+        tags_url: str | None = f"https://{api_registry}/v2/{repository}/tags/list?n={OCI_PAGE_SIZE}"
         headers = {}
-        if token:
-            headers["Authorization"] = f"Bearer {token}"
 
-        while tags_url:
-            response = requests.get(tags_url, headers=headers, timeout=10)
+        def request(method: str, url: str, extra_headers: dict[str, str] | None = None) -> requests.Response:
+            # Public registries that allow tokenless pulls answer straight away; the others
+            # reply 401 with a challenge naming their token endpoint, after which the token
+            # is reused for the remaining requests
+            response = get_session().request(method, url, headers={**headers, **(extra_headers or {})}, timeout=10)
+            if response.status_code == 401 and "Authorization" not in headers:
+                token = _get_oci_token(response.headers.get("WWW-Authenticate", ""), repository)
+                if token:
+                    headers["Authorization"] = f"Bearer {token}"
+                    return request(method, url, extra_headers)
+            return response
+
+        if cached and "versions" in cached and not cached.get("etag") and cached.get("digest"):
+            head = request("HEAD", tags_url)
+            if head.ok and head.headers.get("Docker-Content-Digest") == cached["digest"]:
+                return list(cached["versions"])
+
+        etag = None
+        digest = None
+        pages = 0
+        while tags_url and pages < OCI_MAX_PAGES:
+            conditional = None
+            if pages == 0 and cached and "versions" in cached and cached.get("etag"):
+                conditional = {"If-None-Match": cached["etag"]}
+
+            response = request("GET", tags_url, conditional)
+            if conditional and response.status_code == 304:
+                return list(cached["versions"])
             response.raise_for_status()
+            if pages == 0:
+                etag = response.headers.get("ETag")
+                digest = response.headers.get("Docker-Content-Digest")
+            pages += 1
 
             data = response.json()
             tags = data.get("tags", [])
@@ -151,16 +475,27 @@ def fetch_oci_versions(oci_url: str) -> list[str]:
             # Check for pagination via Link header
             tags_url = _get_next_page_url(response, api_registry)
 
+        if tags_url:
+            console.print(f"[yellow]Warning: Stopped listing OCI tags after {OCI_MAX_PAGES} pages: {oci_url}[/yellow]")
+
         # Filter to only include valid semver-like versions
         # Supports both with and without 'v' prefix (e.g., 1.2.3, v1.2.3)
         # Excludes pre-release versions like -alpha, -beta, -rc, -main unless they're the only option
-        versions = []
-        for tag in all_tags:
-            # Match semantic versions with optional 'v' prefix (e.g., 1.2.3, v1.2.3)
-            # Exclude pre-release suffixes like -alpha, -beta, -rc, -main
-            if re.match(r"^v?\d+\.\d+\.\d+$", tag):
-                # Strip 'v' prefix for consistent version comparison
-                versions.append(tag.lstrip("v"))
+        # The capture group drops the 'v' prefix for consistent version comparison. Cheap
+        # string checks first reject most other tags (latest, main, digests, ...) without
+        # running the regex.
+        versions = [
+            m.group(1)
+            for tag in all_tags
+            if tag[:1] in SEMVER_TAG_FIRST_CHARS and tag.count(".") == 2 and (m := SEMVER_TAG_RE.match(tag))
+        ]
+
+        # The first page's ETag or digest only vouches for the whole list when there was no other page
+        if cached is not None:
+            if pages == 1:
+                cached.update(etag=etag, digest=digest, versions=versions)
+            else:
+                cached.update(etag=None, digest=None)
 
         return versions
     except Exception as e:
@@ -174,12 +509,11 @@ def _get_next_page_url(response: requests.Response, registry: str) -> str | None
 
     The Link header format is: <url>; rel="next"
     """
-    link_header = response.headers.get("Link", "")
+    link_header = response.headers.get("Link")
     if not link_header:
         return None
 
-    # Parse Link header: </v2/repo/tags/list?last=tag&n=100>; rel="next"
-    match = re.search(r'<([^>]+)>;\s*rel="next"', link_header)
+    match = LINK_NEXT_RE.search(link_header)
     if match:
         next_path = match.group(1)
         # Handle relative URLs
@@ -189,28 +523,28 @@ def _get_next_page_url(response: requests.Response, registry: str) -> str | None
     return None
 
 
-def _get_oci_token(registry: str, repository: str) -> str | None:
+def _get_oci_token(challenge: str, repository: str) -> str | None:
     """
-    Get an authentication token for an OCI registry.
+    Get an anonymous pull token for an OCI registry from its WWW-Authenticate challenge.
 
-    Supports anonymous token retrieval for public repositories.
+    The challenge names the token endpoint (realm) and the service and scope to ask it
+    for, e.g. Bearer realm="https://ghcr.io/token",service="ghcr.io",scope="repository:org/repo:pull".
     """
     try:
-        if registry == "ghcr.io":
-            # GitHub Container Registry token endpoint
-            token_url = f"https://ghcr.io/token?scope=repository:{repository}:pull"
-            response = requests.get(token_url, timeout=10)
-            response.raise_for_status()
-            return response.json().get("token")
-        elif registry in ("registry.hub.docker.com", "docker.io"):
-            # Docker Hub token endpoint
-            token_url = f"https://auth.docker.io/token?service=registry.docker.io&scope=repository:{repository}:pull"
-            response = requests.get(token_url, timeout=10)
-            response.raise_for_status()
-            return response.json().get("token")
-        else:
-            # Try without authentication for other registries
+        scheme, _, params = challenge.partition(" ")
+        if scheme.lower() != "bearer":
             return None
+
+        auth_params = dict(AUTH_PARAM_RE.findall(params))
+        realm = auth_params.pop("realm", None)
+        if not realm:
+            return None
+        auth_params.setdefault("scope", f"repository:{repository}:pull")
+
+        response = get_session().get(realm, params=auth_params, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+        return data.get("token") or data.get("access_token")
     except Exception as e:
         console.print(f"[yellow]Warning: Could not get OCI token: {e}[/yellow]")
         return None
@@ -238,31 +572,85 @@ def fetch_github_versions(github_url: str) -> list[str]:
 
         # Fetch releases from GitHub Atom feed
         atom_url = f"https://github.com/{owner}/{repo}/releases.atom"
-        response = requests.get(atom_url, timeout=10)
-        response.raise_for_status()
-
-        # Parse Atom feed
-        root = ET.fromstring(response.content)
-
-        # Atom namespace
-        ns = {"atom": "http://www.w3.org/2005/Atom"}
-
-        versions = []
-        for entry in root.findall("atom:entry", ns):
-            title = entry.find("atom:title", ns)
-            if title is not None and title.text:
-                tag_name = title.text.strip()
-                # Match semantic versions with optional 'v' prefix
-                if re.match(r"^v?\d+\.\d+\.\d+$", tag_name):
-                    # Strip 'v' prefix for consistent version comparison
-                    versions.append(tag_name.lstrip("v"))
+        with get_session().get(atom_url, stream=True, timeout=10) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
 
-        return versions
+            titles = (title.strip() for title in _iter_feed_titles(response.raw))
+            return [m.group(1) for m in map(SEMVER_TAG_RE.match, titles) if m]
     except Exception as e:
         console.print(f"[yellow]Warning: Could not fetch GitHub releases: {e}[/yellow]")
         return []
 
 
+# Number of times each file has been rewritten by this process. Part of the scan memo
+# key, since a rewrite within the filesystem's timestamp granularity keeps the same mtime.
+_rewrites: Counter[str] = Counter()
+
+
+def _memo_key(file_path: Path) -> tuple[str, int, int, int]:
+    """Key identifying the current contents of a file: (path, mtime, size, rewrite count)."""
+    stat = file_path.stat()
+    path = str(file_path.resolve())
+    return path, stat.st_mtime_ns, stat.st_size, _rewrites[path]
+
+
+@lru_cache(maxsize=256)
+def _read_small_file(path: str, _mtime_ns: int, _size: int, _rewrite: int) -> bytes:
+    """
+    Read the raw contents of a file smaller than MMAP_MIN_SIZE.
+
+    Memoized on the same key as _scan_promoter_lines, so scanning a file and then
+    rewriting it reads it from disk only once.
+    """
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@lru_cache(maxsize=256)
+def _scan_promoter_lines(path: str, mtime_ns: int, size: int, rewrite: int) -> tuple[tuple[int, str, str], ...]:
+    """
+    Scan a file for promoter lines.
+
+    Memoized on the file's modification time, size and rewrite count, so a file is
+    only re-read once it has changed on disk.
+    """
+    # Small files (the usual one ApplicationSet per addon) cost fewer syscalls with a
+    # single read() than with mapping and unmapping them
+    if size < MMAP_MIN_SIZE:
+        return _find_marked_lines(_read_small_file(path, mtime_ns, size, rewrite))
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return _find_marked_lines(mm)
+
+
+def _find_marked_lines(data: bytes | mmap.mmap) -> tuple[tuple[int, str, str], ...]:
+    """Extract the promoter lines from the raw contents of a file."""
+    promoter_lines = []
+
+    # Jump from marker to marker in the raw bytes, so only the marked lines are decoded
+    line_num = 1
+    counted_to = 0
+    pos = data.find(PROMOTER_MARKER_BYTES)
+    while pos != -1:
+        start = data.rfind(b"\n", 0, pos) + 1
+        end = data.find(b"\n", pos)
+        if end == -1:
+            end = len(data)
+
+        line_num += data[counted_to:start].count(b"\n")
+        counted_to = start
+
+        # Pattern: addonChartVersion: 2.7.0 # promote this
+        match = PROMOTER_LINE_RE.match(data[start:end].decode())
+        if match:
+            promoter_lines.append((line_num, match.group(1), match.group(2)))
+
+        pos = data.find(PROMOTER_MARKER_BYTES, end)
+
+    return tuple(promoter_lines)
+
+
 def find_promoter_lines(file_path: Path) -> list[tuple[int, str, str]]:
     """
     Find lines in YAML file marked with '# promote this'.
@@ -271,37 +659,120 @@ def find_promoter_lines(file_path: Path) -> list[tuple[int, str, str]]:
         List of tuples: (line_number, field_name, current_version)
     """
     try:
-        with open(file_path) as f:
-            lines = f.readlines()
-
-        promoter_lines = []
-        for i, line in enumerate(lines, start=1):
-            if "# promote this" in line:
-                # Extract field name and version
-                # Pattern: addonChartVersion: 2.7.0 # promote this
-                match = re.match(r"\s*(\w+):\s*([^\s#]+)", line)
-                if match:
-                    field_name = match.group(1)
-                    current_version = match.group(2)
-                    promoter_lines.append((i, field_name, current_version))
-
-        return promoter_lines
+        return list(_scan_promoter_lines(*_memo_key(file_path)))
     except Exception as e:
         console.print(f"[yellow]Warning: Could not read file {file_path}: {e}[/yellow]")
         return []
 
 
+def prescan_promoter_files(
+    paths: list[Path], max_workers: int = DEFAULT_FETCH_WORKERS
+) -> dict[Path, list[tuple[int, str, str]]]:
+    """
+    Find the promoter lines of several files concurrently.
+
+    Also warms the scan memo used by find_promoter_lines.
+
+    Returns:
+        Mapping of file path to its promoter lines
+    """
+    unique_paths = list(dict.fromkeys(paths))
+    if not unique_paths:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, MAX_SCAN_WORKERS)) as executor:
+        return dict(zip(unique_paths, executor.map(find_promoter_lines, unique_paths), strict=True))
+
+
+# Memoized version parsing; the same version strings are compared many times per run
+_parse = lru_cache(maxsize=4096)(version.parse)
+
+
 def get_latest_version(versions: list[str]) -> str | None:
     """Get the latest version from a list of version strings."""
     if not versions:
         return None
 
     try:
-        parsed_versions = [version.parse(v) for v in versions]
-        latest = max(parsed_versions)
-        return str(latest)
+        return str(max(map(_parse, versions)))
     except Exception:
-        return versions[0] if versions else None
+        return versions[0]
+
+
+def version_cache_key(dep: Dependency) -> str:
+    """Key of a dependency's repository in the version cache."""
+    cache_key = f"{dep.repo_type}:{dep.repo_url}"
+    if dep.chart is not None:
+        cache_key += f"#{dep.chart}"
+    return cache_key
+
+
+def fetch_dependency_versions(dep: Dependency, cache: dict[str, dict] | None = None) -> list[str]:
+    """
+    Fetch the versions available for a dependency from its configured repository.
+
+    If a `cache` is given, versions fetched less than VERSION_CACHE_TTL seconds ago
+    are returned without contacting the repository, and fresh results are stored in it.
+    """
+    cache_key = None
+    cached = None
+    if cache is not None and dep.repo_url:
+        cache_key = version_cache_key(dep)
+        cached = cache.setdefault(cache_key, {})
+        if "versions" in cached and time.time() - cached.get("fetched_at", 0) < VERSION_CACHE_TTL:
+            return list(cached["versions"])
+
+    versions = []
+    if dep.repo_type == "rss" and dep.repo_url:
+        versions = fetch_rss_versions(dep.repo_url, cached=cached)
+    elif dep.repo_type == "oci" and dep.repo_url:
+        versions = fetch_oci_versions(dep.repo_url, cached=cached)
+    elif dep.repo_type == "github" and dep.repo_url:
+        versions = fetch_github_versions(dep.repo_url)
+    elif dep.repo_type == "helm":
+        versions = fetch_helm_repo_versions(dep.repo_url, chart_name=dep.chart)
+
+    # Failed lookups come back empty; don't let them mask the repository until the TTL expires
+    if cached is not None:
+        if versions:
+            cached.update(versions=versions, fetched_at=time.time())
+        elif not cached:
+            del cache[cache_key]
+
+    return versions
+
+
+def resolve_latest_versions(
+    dependencies: list[Dependency], max_workers: int = DEFAULT_FETCH_WORKERS, use_cache: bool = True
+) -> dict[tuple[str | None, str | None, str | None], str | None]:
+    """
+    Resolve the latest available version of several dependencies concurrently.
+
+    Dependencies tracking the same repository share a single lookup. Unless
+    `use_cache` is False, lookups go through the on-disk version cache.
+
+    Returns:
+        Mapping of Dependency.repository to the latest version available there
+    """
+    # One representative dependency per repository
+    repositories = {dep.repository: dep for dep in dependencies}
+    if not repositories:
+        return {}
+
+    cache = load_version_cache() if use_cache else None
+
+    def resolve(dep: Dependency) -> str | None:
+        return get_latest_version(fetch_dependency_versions(dep, cache=cache))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        latest_versions = dict(zip(repositories, executor.map(resolve, repositories.values()), strict=True))
+
+    if cache is not None:
+        # Drop the entries of repositories no longer looked up, so the cache does not grow forever
+        keys = {version_cache_key(dep) for dep in repositories.values()}
+        save_version_cache({key: entry for key, entry in cache.items() if key in keys})
+
+    return latest_versions
 
 
 @app.command()
@@ -319,6 +790,18 @@ def check(
         "-n",
         help="Show what would be checked without making any changes",
     ),
+    workers: int = typer.Option(
+        DEFAULT_FETCH_WORKERS,
+        "--workers",
+        "-w",
+        min=1,
+        help=f"Maximum number of concurrent repository requests (and file scans, up to {MAX_SCAN_WORKERS})",
+    ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Query every repository instead of using the on-disk version cache",
+    ),
 ):
     """
     Check for new versions based on promoter configuration.
@@ -348,61 +831,55 @@ def check(
 
     updates_available = 0
 
-    for dep in config["dependencies"]:
-        dep_name = dep.get("name", "Unknown")
-        source_file = dep.get("source", {}).get("file")
-        repo_info = dep.get("repository", {})
+    dependencies = normalize_dependencies(config)
+    scans = prescan_promoter_files([dep.path for dep in dependencies], max_workers=workers)
+    # Only dependencies with promoter markers need their repository queried
+    latest_versions = resolve_latest_versions(
+        [dep for dep in dependencies if scans[dep.path]], max_workers=workers, use_cache=not no_cache
+    )
 
-        if not source_file:
-            console.print(f"[yellow]Warning: No source file for {dep_name}[/yellow]")
-            continue
-
-        file_path = Path(source_file)
-        if not file_path.exists():
-            console.print(f"[yellow]Warning: File not found: {file_path}[/yellow]")
-            continue
+    for dep in dependencies:
+        dep_name = dep.name
+        file_path = dep.file
 
         if verbose:
             console.print(f"\n[blue]Checking {dep_name}...[/blue]")
 
         # Find lines marked with promoter
-        promoter_lines = find_promoter_lines(file_path)
+        promoter_lines = scans[dep.path]
 
         if not promoter_lines:
             if verbose:
                 console.print(f"[yellow]No promoter markers found in {file_path}[/yellow]")
             continue
 
-        # Fetch available versions
-        available_versions = []
-        repo_type = repo_info.get("type")
-        repo_url = repo_info.get("url")
-        if repo_type == "rss" and repo_url:
-            available_versions = fetch_rss_versions(repo_url)
-        elif repo_type == "oci" and repo_url:
-            available_versions = fetch_oci_versions(repo_url)
-        elif repo_type == "github" and repo_url:
-            available_versions = fetch_github_versions(repo_url)
-        elif repo_type == "helm":
-            chart_name = repo_info.get("chart")
-            available_versions = fetch_helm_repo_versions(repo_url, chart_name=chart_name)
-
-        latest_version = get_latest_version(available_versions)
+        latest_version = latest_versions.get(dep.repository)
+        # An unparseable latest version is reported on each line rather than treated as missing
+        latest_error = None
+        try:
+            latest_parsed = _parse(latest_version) if latest_version else None
+        except version.InvalidVersion as e:
+            latest_parsed = None
+            latest_error = e
 
         for _line_num, _field_name, current_ver in promoter_lines:
             status = "✓ Up to date"
             status_style = "green"
 
-            if latest_version:
+            if latest_error is not None:
+                status = "? Unknown"
+                status_style = "dim"
+            # Identical strings need no parsing: the common steady state
+            elif latest_parsed is not None and current_ver != latest_version:
                 try:
-                    if version.parse(latest_version) > version.parse(current_ver):
+                    if latest_parsed > _parse(current_ver):
                         status = "⚠ Update available"
                         status_style = "bold yellow"
                         updates_available += 1
                 except Exception:
                     status = "? Unknown"
                     status_style = "dim"
-            else:
+            elif latest_parsed is None:
                 status = "? Cannot check"
                 status_style = "dim"
 
@@ -426,48 +903,93 @@ def check(
         sys.exit(0)
 
 
-def update_version_in_file(
-    file_path: Path,
-    line_num: int,
-    old_version: str,
-    new_version: str,
-    dry_run: bool = False,
-) -> bool:
+def _replace_file(file_path: Path, lines: list[str]) -> None:
     """
-    Update a version in a YAML file.
+    Atomically replace the contents of a file.
+
+    The lines are written to a temporary file in the same directory, which is then
+    renamed over the original, so readers never see a truncated file. Symlinks are
+    resolved first, so the link is kept and its target is the file replaced, and the
+    original owner and group are kept where permitted.
+    """
+    file_path = file_path.resolve()
+    fd, tmp_name = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.writelines(lines)
+        shutil.copymode(file_path, tmp_name)
+        if hasattr(os, "chown"):
+            # Keep the original owner and group where permitted
+            stat = file_path.stat()
+            with contextlib.suppress(PermissionError):
+                os.chown(tmp_name, stat.st_uid, stat.st_gid)
+        os.replace(tmp_name, file_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _read_lines(file_path: Path) -> list[str]:
+    """Read a file as a list of lines, reusing the contents read when it was scanned if unchanged."""
+    key = _memo_key(file_path)
+    if key[2] < MMAP_MIN_SIZE:
+        return io.TextIOWrapper(io.BytesIO(_read_small_file(*key))).readlines()
+
+    with open(file_path) as f:
+        return f.readlines()
+
+
+def apply_version_edits(lines: list[str], edits: list[tuple[int, str, str]]) -> dict[int, bool]:
+    """
+    Apply version updates to a file's lines in place.
 
     Args:
-        file_path: Path to the file to update
-        line_num: Line number to update (1-indexed)
-        old_version: Current version to replace
-        new_version: New version to set
-        dry_run: If True, don't actually modify the file
+        lines: The file's lines, as returned by _read_lines
+        edits: Tuples of (line number (1-indexed), current version, new version)
 
     Returns:
-        True if update was successful (or would be in dry-run mode)
+        Mapping of line number to True if that update was applied
     """
-    try:
-        with open(file_path) as f:
-            lines = f.readlines()
-
+    results = {}
+    for line_num, old_version, new_version in edits:
         if line_num > len(lines):
-            return False
+            results[line_num] = False
+            continue
 
-        original_line = lines[line_num - 1]
-        updated_line = original_line.replace(old_version, new_version)
+        # Only rewrite the field's value, leaving any other occurrence of the
+        # version on the line (e.g. in a trailing comment) untouched
+        line = lines[line_num - 1]
+        match = PROMOTER_LINE_RE.match(line)
+        if old_version == new_version or not match or match.group(2) != old_version:
+            results[line_num] = False
+            continue
 
-        if original_line == updated_line:
-            return False
+        lines[line_num - 1] = line[: match.start(2)] + new_version + line[match.end(2) :]
+        results[line_num] = True
 
-        if not dry_run:
-            lines[line_num - 1] = updated_line
-            with open(file_path, "w") as f:
-                f.writelines(lines)
+    return results
 
-        return True
-    except Exception as e:
-        console.print(f"[red]Error updating file: {e}[/red]")
-        return False
+
+def _write_lines(file_path: Path, lines: list[str]) -> None:
+    """Atomically replace a file with the given lines, invalidating its memoized scan."""
+    _replace_file(file_path, lines)
+    _rewrites[str(file_path.resolve())] += 1
+
+
+def write_summary(content: str) -> None:
+    """Write the markdown update summary to SUMMARY_FILE in a single unbuffered write."""
+    if os.name == "nt":
+        # os.open flag semantics differ on Windows; use the regular text-mode path there
+        Path(SUMMARY_FILE).write_text(content)
+        return
+
+    data = memoryview(content.encode("utf-8"))
+    fd = os.open(SUMMARY_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while data:
+            data = data[os.write(fd, data) :]
+    finally:
+        os.close(fd)
 
 
 @app.command()
@@ -491,6 +1013,18 @@ def update(
         "-a",
         help="Apply the updates (required to actually modify files)",
     ),
+    workers: int = typer.Option(
+        DEFAULT_FETCH_WORKERS,
+        "--workers",
+        "-w",
+        min=1,
+        help=f"Maximum number of concurrent repository requests (and file scans, up to {MAX_SCAN_WORKERS})",
+    ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Query every repository instead of using the on-disk version cache",
+    ),
 ):
     """
     Update versions in files based on promoter configuration.
@@ -535,87 +1069,115 @@ def update(
     updates_made = 0
     updates_skipped = 0
     markdown_rows = []
-
-    for dep in config["dependencies"]:
-        dep_name = dep.get("name", "Unknown")
-        source_file = dep.get("source", {}).get("file")
-        repo_info = dep.get("repository", {})
-
-        if not source_file:
-            console.print(f"[yellow]Warning: No source file for {dep_name}[/yellow]")
-            continue
-
-        file_path = Path(source_file)
-        if not file_path.exists():
-            console.print(f"[yellow]Warning: File not found: {file_path}[/yellow]")
-            continue
+    # Rows of each dependency, completed once the edited files have been written
+    results = []
+    # Contents of the files edited so far, by resolved path; each is written back once, after every dependency
+    file_buffers: dict[Path, list[str]] = {}
+
+    dependencies = normalize_dependencies(config)
+    scans = prescan_promoter_files([dep.path for dep in dependencies], max_workers=workers)
+    # Only dependencies with promoter markers need their repository queried
+    latest_versions = resolve_latest_versions(
+        [dep for dep in dependencies if scans[dep.path]], max_workers=workers, use_cache=not no_cache
+    )
+
+    for dep in dependencies:
+        dep_name = dep.name
+        file_path = dep.file
 
         if verbose:
             console.print(f"\n[blue]Processing {dep_name}...[/blue]")
 
-        # Find lines marked with promoter
-        promoter_lines = find_promoter_lines(file_path)
+        # Find lines marked with promoter. A file shared by several dependencies may
+        # already have been edited for an earlier one, so scan its edited contents.
+        if dep.path in file_buffers:
+            promoter_lines = _find_marked_lines("".join(file_buffers[dep.path]).encode())
+        else:
+            promoter_lines = scans[dep.path]
 
         if not promoter_lines:
             if verbose:
                 console.print(f"[yellow]No promoter markers found in {file_path}[/yellow]")
             continue
 
-        # Fetch available versions
-        available_versions = []
-        repo_type = repo_info.get("type")
-        repo_url = repo_info.get("url")
-        if repo_type == "rss" and repo_url:
-            available_versions = fetch_rss_versions(repo_url)
-        elif repo_type == "oci" and repo_url:
-            available_versions = fetch_oci_versions(repo_url)
-        elif repo_type == "github" and repo_url:
-            available_versions = fetch_github_versions(repo_url)
-        elif repo_type == "helm":
-            chart_name = repo_info.get("chart")
-            available_versions = fetch_helm_repo_versions(repo_url, chart_name=chart_name)
+        latest_version = latest_versions.get(dep.repository)
+        # An unparseable latest version is reported on each line rather than treated as missing
+        latest_error = None
+        try:
+            latest_parsed = _parse(latest_version) if latest_version else None
+        except version.InvalidVersion as e:
+            latest_parsed = None
+            latest_error = e
+
+        # Decide on every promoter line first, so the edits are applied in one pass
+        rows = []
+        edits = []
+        for line_num, _field_name, current_ver in promoter_lines:
+            if latest_error is not None:
+                rows.append((line_num, current_ver, f"✗ Error: {latest_error}", "red"))
+                updates_skipped += 1
+                continue
 
-        latest_version = get_latest_version(available_versions)
+            if latest_parsed is None:
+                rows.append((line_num, current_ver, "? Cannot check", "yellow"))
+                updates_skipped += 1
+                continue
 
-        for line_num, _field_name, current_ver in promoter_lines:
-            status = "⊘ Skipped"
-            status_style = "dim"
+            # Identical strings need no parsing: the common steady state
+            if current_ver == latest_version:
+                rows.append((line_num, current_ver, "✓ Already latest", "green"))
+                updates_skipped += 1
+                continue
+
+            try:
+                if latest_parsed > _parse(current_ver):
+                    # Update needed; status is known once the edits are applied
+                    edits.append((line_num, current_ver, latest_version))
+                    rows.append((line_num, current_ver, None, None))
+                else:
+                    rows.append((line_num, current_ver, "✓ Already latest", "green"))
+                    updates_skipped += 1
+            except Exception as e:
+                rows.append((line_num, current_ver, f"✗ Error: {str(e)}", "red"))
+                updates_skipped += 1
 
-            if latest_version:
-                try:
-                    if version.parse(latest_version) > version.parse(current_ver):
-                        # Update needed
-                        success = update_version_in_file(
-                            file_path,
-                            line_num,
-                            current_ver,
-                            latest_version,
-                            dry_run=not apply,
-                        )
-
-                        if success:
-                            if not apply:
-                                status = "→ Would update"
-                                status_style = "blue"
-                            else:
-                                status = "✓ Updated"
-                                status_style = "green"
-                            updates_made += 1
-                        else:
-                            status = "✗ Failed"
-                            status_style = "red"
+        applied = {}
+        if edits:
+            try:
+                lines = file_buffers.get(dep.path) or _read_lines(dep.path)
+                applied = apply_version_edits(lines, edits)
+                if any(applied.values()):
+                    file_buffers[dep.path] = lines
+            except Exception as e:
+                console.print(f"[red]Error updating file: {e}[/red]")
+
+        results.append((dep_name, dep, latest_version, rows, applied))
+
+    # Write each edited file once, however many dependencies it holds
+    failed_files = set()
+    if apply:
+        for file_path, lines in file_buffers.items():
+            try:
+                _write_lines(file_path, lines)
+            except Exception as e:
+                console.print(f"[red]Error updating file: {e}[/red]")
+                failed_files.add(file_path)
+
+    for dep_name, dep, latest_version, rows, applied in results:
+        file_path = dep.file
+        for line_num, current_ver, status, status_style in rows:
+            if status is None:
+                if applied.get(line_num) and dep.path not in failed_files:
+                    if not apply:
+                        status = "→ Would update"
+                        status_style = "blue"
                     else:
-                        status = "✓ Already latest"
+                        status = "✓ Updated"
                         status_style = "green"
-                        updates_skipped += 1
-                except Exception as e:
-                    status = f"✗ Error: {str(e)}"
+                    updates_made += 1
+                else:
+                    status = "✗ Failed"
                     status_style = "red"
-                    updates_skipped += 1
-            else:
-                status = "? Cannot check"
-                status_style = "yellow"
-                updates_skipped += 1
 
             table.add_row(
                 dep_name,
@@ -628,7 +1190,7 @@ def update(
             # Add to markdown table if updated or would be updated
             if "Updated" in status or "Would update" in status:
                 markdown_rows.append(
-                    f"| {dep_name} | {file_path.name} | {current_ver} | {latest_version or 'N/A'} | {status.replace('→', '').replace('✓', '').strip()} |"
+                    f"| {dep_name} | {file_path.name} | {current_ver} | {latest_version or 'N/A'} | {status.translate(SUMMARY_STATUS_STRIP).strip()} |"
                 )
 
     console.print("\n")
@@ -637,16 +1199,19 @@ def update(
 
     # Output markdown table for GitHub Actions
     if markdown_rows:
-        markdown_table = "| Dependency | File | Old Version | New Version | Status |\n"
-        markdown_table += "|------------|------|-------------|-------------|--------|\n"
-        markdown_table += "\n".join(markdown_rows)
+        markdown_table = "\n".join(
+            [
+                "| Dependency | File | Old Version | New Version | Status |",
+                "|------------|------|-------------|-------------|--------|",
+                *markdown_rows,
+            ]
+        )
 
         # Write to file for GitHub Actions to read
-        with open("update-summary.md", "w") as f:
-            f.write(markdown_table)
+        write_summary(markdown_table)
 
         if verbose:
-            console.print("[blue]Markdown summary written to update-summary.md[/blue]\n")
+            console.print(f"[blue]Markdown summary written to {SUMMARY_FILE}[/blue]\n")
 
     if updates_made > 0:
         if not apply: